@@ -2,12 +2,22 @@
 import os
 import json
 import random
+import re
 import logging
 import asyncio
-from datetime import datetime, timedelta
+import stat
+import time
+import tempfile
+from datetime import datetime, timezone, time as dtime
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import List, Set
+from typing import Any, Dict, List, Set, Tuple
+from zoneinfo import ZoneInfo
 
+import aiosqlite
+import orjson
+from tzlocal import get_localzone
 from telegram import Update
 from telegram.ext import (
     ApplicationBuilder,
@@ -43,6 +53,7 @@ QUIZZES_FILE = getattr(config, "QUIZZES_FILE", f"{DATA_DIR}/quizzes.json")
 EVENTS_FILE = getattr(config, "EVENTS_FILE", f"{DATA_DIR}/events.json")
 VERSES_FILE = getattr(config, "VERSES_FILE", f"{DATA_DIR}/verses.json")
 ADMIN_FILE = f"{DATA_DIR}/admins.json"
+DB = getattr(config, "DB_FILE", f"{DATA_DIR}/church.db")
 GROUPS_FILE = f"{DATA_DIR}/groups.json"  # optional if you want to persist group IDs
 
 # -------------------------
@@ -59,11 +70,9 @@ def ensure_paths():
             with open(path, "w", encoding="utf-8") as f:
                 json.dump(default, f, ensure_ascii=False, indent=2)
 
-    create_file(USERS_FILE, {})
     create_file(QUIZZES_FILE, [])
     create_file(EVENTS_FILE, [])
     create_file(VERSES_FILE, [])
-    create_file(ADMIN_FILE, [])        # list of extra admins
     create_file(GROUPS_FILE, [])       # optional persistent group list
 
 ensure_paths()
@@ -71,62 +80,201 @@ ensure_paths()
 # -------------------------
 # JSON helpers
 # -------------------------
+# path -> (st_mtime_ns, last checked (monotonic), parsed data)
+_JSON_CACHE: Dict[str, Tuple[int, float, Any]] = {}
+
+# seconds a cached file is trusted without even a stat() (read-mostly files)
+JSON_TTL: Dict[str, float] = {
+    VERSES_FILE: 1.0,
+}
+
 def load_json(path, default):
+    now = time.monotonic()
+    cached = _JSON_CACHE.get(path)
+    if cached and now - cached[1] < JSON_TTL.get(path, 0.0):
+        return cached[2]
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        mtime = os.stat(path).st_mtime_ns
+        if cached and cached[0] == mtime:
+            _JSON_CACHE[path] = (mtime, now, cached[2])
+            return cached[2]
+        data = orjson.loads(Path(path).read_bytes())
+        _JSON_CACHE[path] = (mtime, now, data)
+        return data
     except Exception as e:
         logger.warning("Load failed (%s): %s", path, e)
         return default
 
+# process umask, read once at import (os.umask can only be read by setting it)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
 def save_json(path, data):
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    # write to a unique temp file and swap it in, so readers never see a half-written file
+    f = tempfile.NamedTemporaryFile(dir=os.path.dirname(path) or ".", suffix=".tmp", delete=False)
+    try:
+        with f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        # temp files are created 0600; keep the mode the file has (or a plain open() would give)
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        os.chmod(f.name, mode)
+        os.replace(f.name, path)
+    except BaseException:
+        os.unlink(f.name)
+        raise
+    # keep the cache in step with what we just wrote
+    _JSON_CACHE[path] = (os.stat(path).st_mtime_ns, time.monotonic(), data)
+
+# -------------------------
+# Database (users, prayer requests, extra admins)
+# -------------------------
+DB_CONN: aiosqlite.Connection = None
+# handlers share DB_CONN, so write transactions must not interleave; reads skip the lock
+DB_WRITE_LOCK = asyncio.Lock()
+
+@asynccontextmanager
+async def db_write():
+    """One write transaction under DB_WRITE_LOCK: commit on success, roll back on error."""
+    async with DB_WRITE_LOCK:
+        try:
+            yield DB_CONN
+            await DB_CONN.commit()
+        except BaseException:
+            await DB_CONN.rollback()
+            raise
+
+async def init_db(app=None):
+    global DB_CONN
+    DB_CONN = await aiosqlite.connect(DB)
+    await DB_CONN.execute("PRAGMA journal_mode=WAL")
+    await DB_CONN.execute("PRAGMA synchronous=NORMAL")
+    await DB_CONN.execute("PRAGMA busy_timeout=5000")
+    await DB_CONN.execute("PRAGMA cache_size=-32000")  # ~32MB page cache
+    await DB_CONN.execute("PRAGMA temp_store=MEMORY")
+    await DB_CONN.execute("""
+    CREATE TABLE IF NOT EXISTS users(
+        uid INTEGER PRIMARY KEY,
+        username TEXT,
+        full_name TEXT,
+        quiz_score INTEGER DEFAULT 0,
+        first_seen INTEGER
+    )""")
+    await DB_CONN.execute("CREATE INDEX IF NOT EXISTS idx_score ON users(quiz_score DESC)")
+    await DB_CONN.execute("""
+    CREATE TABLE IF NOT EXISTS prayer_requests(
+        uid INTEGER,
+        text TEXT,
+        time INTEGER
+    )""")
+    await DB_CONN.execute("CREATE INDEX IF NOT EXISTS idx_prayer_uid ON prayer_requests(uid)")
+    await DB_CONN.execute("CREATE TABLE IF NOT EXISTS admins(uid INTEGER PRIMARY KEY)")
+    await migrate_json()
+    await DB_CONN.commit()
+
+    async with DB_CONN.execute("SELECT uid FROM admins") as cur:
+        ADMINS.update([row[0] async for row in cur])
+
+async def close_db(app=None):
+    if DB_CONN is not None:
+        await DB_CONN.close()
+
+def _epoch(iso):
+    # old JSON stored naive utcnow().isoformat() strings
+    try:
+        return int(datetime.fromisoformat(iso).replace(tzinfo=timezone.utc).timestamp())
+    except (TypeError, ValueError):
+        return None
+
+async def migrate_json():
+    """One-time import of the old users.json / admins.json into SQLite.
+
+    The files are parsed strictly (a corrupt file stops startup instead of
+    importing nothing) and only renamed to *.migrated once the import is committed.
+    """
+    migrated = []
+    if os.path.exists(USERS_FILE):
+        users = orjson.loads(Path(USERS_FILE).read_bytes())
+        await DB_CONN.executemany(
+            "INSERT OR IGNORE INTO users(uid, username, full_name, quiz_score, first_seen) VALUES (?, ?, ?, ?, ?)",
+            [(int(k), d.get("username"), d.get("full_name"), d.get("quiz_score", 0), _epoch(d.get("first_seen")))
+             for k, d in users.items()]
+        )
+        await DB_CONN.executemany(
+            "INSERT INTO prayer_requests(uid, text, time) VALUES (?, ?, ?)",
+            [(int(k), p.get("text"), _epoch(p.get("time")))
+             for k, d in users.items() for p in d.get("prayer_requests", [])]
+        )
+        migrated.append(USERS_FILE)
+        logger.info("Imported %d users from %s", len(users), USERS_FILE)
+    if os.path.exists(ADMIN_FILE):
+        extra = orjson.loads(Path(ADMIN_FILE).read_bytes())
+        await DB_CONN.executemany("INSERT OR IGNORE INTO admins(uid) VALUES (?)", [(int(x),) for x in extra])
+        migrated.append(ADMIN_FILE)
+    await DB_CONN.commit()
+    for path in migrated:
+        os.replace(path, path + ".migrated")
 
 # -------------------------
 # Admin management (in-memory + persistent)
 # -------------------------
+# owners from config.py; these can never be removed
+_BASE_ADMINS = frozenset(int(x) for x in getattr(config, "ADMIN_IDS", []))
+
 def load_admins() -> Set[int]:
-    base = getattr(config, "ADMIN_IDS", [])
-    extra = load_json(ADMIN_FILE, [])
-    try:
-        extra_ints = [int(x) for x in extra]
-    except Exception:
-        extra_ints = []
-    return set([int(x) for x in base] + extra_ints)
+    return set(_BASE_ADMINS)
 
+# config admins now; extra admins are added from the db in init_db
 ADMINS: Set[int] = load_admins()
 
-def persist_admins():
-    base = set(getattr(config, "ADMIN_IDS", []))
-    extras = list(sorted(ADMINS - base))
-    save_json(ADMIN_FILE, extras)
+async def persist_admin(uid: int, added: bool):
+    async with db_write():
+        if added:
+            await DB_CONN.execute("INSERT OR IGNORE INTO admins(uid) VALUES (?)", (uid,))
+        else:
+            await DB_CONN.execute("DELETE FROM admins WHERE uid = ?", (uid,))
 
 def is_admin(uid: int) -> bool:
     return int(uid) in ADMINS
 
+def parse_id(arg: str):
+    """Telegram user/chat id from a command argument, or None if it isn't one."""
+    digits = arg[1:] if arg.startswith("-") else arg
+    return int(arg) if digits.isdecimal() else None
+
 # -------------------------
 # User system
 # -------------------------
-def add_user(uid: int, username: str = None, name: str = None):
-    users = load_json(USERS_FILE, {})
-    uid_s = str(uid)
-    if uid_s not in users:
-        users[uid_s] = {
-            "username": username,
-            "full_name": name,
-            "quiz_score": 0,
-            "prayer_requests": [],
-            "first_seen": datetime.utcnow().isoformat(),
-        }
-    else:
-        users[uid_s]["username"] = username
-        users[uid_s]["full_name"] = name
-    save_json(USERS_FILE, users)
+UPSERT_USER_SQL = (
+    "INSERT INTO users(uid, username, full_name, first_seen) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT(uid) DO UPDATE SET username = excluded.username, full_name = excluded.full_name "
+    "WHERE username IS NOT excluded.username OR full_name IS NOT excluded.full_name"
+)
+
+# uid -> (username, full_name) as last written, so returning users cost no write.
+# LRU-bounded: a forgotten user just costs one idempotent upsert.
+_KNOWN_USERS: "OrderedDict[int, Tuple[str, str]]" = OrderedDict()
+KNOWN_USERS_MAX = getattr(config, "KNOWN_USERS_MAX", 10000)
 
-def get_users_list() -> List[int]:
-    users = load_json(USERS_FILE, {})
-    return [int(k) for k in users.keys()]
+def remember_user(uid: int, user: Tuple[str, str]):
+    _KNOWN_USERS[uid] = user
+    _KNOWN_USERS.move_to_end(uid)
+    if len(_KNOWN_USERS) > KNOWN_USERS_MAX:
+        _KNOWN_USERS.popitem(last=False)
+
+async def add_user(uid: int, username: str = None, name: str = None):
+    if _KNOWN_USERS.get(uid) == (username, name):
+        _KNOWN_USERS.move_to_end(uid)
+        return
+    async with db_write():
+        await DB_CONN.execute(UPSERT_USER_SQL, (uid, username, name, int(time.time())))
+    remember_user(uid, (username, name))
+
+async def get_users_list() -> List[int]:
+    async with DB_CONN.execute("SELECT uid FROM users") as cur:
+        return [row[0] for row in await cur.fetchall()]
 
 # -------------------------
 # Optional: persist group ids (if you want)
@@ -138,44 +286,92 @@ def load_saved_groups() -> List[int]:
     except Exception:
         return []
 
-def save_group(gid: int):
-    groups = load_saved_groups()
-    if gid not in groups:
-        groups.append(gid)
-        save_json(GROUPS_FILE, groups)
+SAVED_GROUPS: Set[int] = set(load_saved_groups())
+
+# config GROUP_IDS + SAVED_GROUPS, shared by broadcasts until a new group is saved
+_GROUPS_SNAPSHOT: List[int] = None
+# one groups.json write at a time, so an older snapshot can't land after a newer one
+_GROUPS_WRITE_LOCK = asyncio.Lock()
+
+async def save_group(gid: int):
+    global _GROUPS_SNAPSHOT
+    # only touch disk when a new group shows up
+    if gid not in SAVED_GROUPS:
+        SAVED_GROUPS.add(gid)
+        _GROUPS_SNAPSHOT = None
+        try:
+            async with _GROUPS_WRITE_LOCK:
+                await asyncio.to_thread(save_json, GROUPS_FILE, sorted(SAVED_GROUPS))
+        except BaseException:
+            # forget it so the next message from this group retries the write
+            SAVED_GROUPS.discard(gid)
+            _GROUPS_SNAPSHOT = None
+            raise
+
+def broadcast_groups() -> List[int]:
+    global _GROUPS_SNAPSHOT
+    if _GROUPS_SNAPSHOT is None:
+        _GROUPS_SNAPSHOT = list({*(getattr(config, "GROUP_IDS", []) or []), *SAVED_GROUPS})
+    return _GROUPS_SNAPSHOT
 
 # -------------------------
 # Broadcast helpers
 # -------------------------
+BROADCAST_CONCURRENCY = getattr(config, "BROADCAST_CONCURRENCY", 20)
+BROADCAST_RATE = getattr(config, "BROADCAST_RATE", 30)  # msgs/sec, Telegram's global limit
+
+class RateLimiter:
+    """Token bucket allowing `rate` acquisitions per second."""
+
+    def __init__(self, rate: float):
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        self.rate = rate
+        # room for at least one token, or rates below 1/s could never send
+        self.burst = max(rate, 1)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+_send_limiter = RateLimiter(BROADCAST_RATE)
+
+async def send_many(bot, chat_ids: List[int], message: str, fail_log: str):
+    """Send to many chats concurrently, bounded by BROADCAST_CONCURRENCY and BROADCAST_RATE."""
+    sem = asyncio.Semaphore(BROADCAST_CONCURRENCY)
+
+    async def _send(cid):
+        async with sem:
+            await _send_limiter.acquire()
+            try:
+                await bot.send_message(chat_id=cid, text=message)
+                return True
+            except Exception as e:
+                logger.warning(fail_log, cid, e)
+                return False
+
+    results = await asyncio.gather(*(_send(cid) for cid in chat_ids))
+    success = sum(results)
+    return success, len(results) - success
+
 async def broadcast_to_groups(bot, message: str, groups: List[int] = None):
     if groups is None:
-        groups = getattr(config, "GROUP_IDS", []) or []
-        groups = list(dict.fromkeys(groups + load_saved_groups()))
-    success = 0
-    failed = 0
-    for gid in groups:
-        try:
-            await bot.send_message(chat_id=gid, text=message)
-            success += 1
-            await asyncio.sleep(0.05)
-        except Exception as e:
-            failed += 1
-            logger.warning("Broadcast failed to %s: %s", gid, e)
-    return success, failed
+        groups = broadcast_groups()
+    return await send_many(bot, groups, message, "Broadcast failed to %s: %s")
 
 async def broadcast_to_users(bot, message: str):
-    user_ids = get_users_list()
-    success = 0
-    failed = 0
-    for uid in user_ids:
-        try:
-            await bot.send_message(chat_id=uid, text=message)
-            success += 1
-            await asyncio.sleep(0.05)
-        except Exception as e:
-            failed += 1
-            logger.warning("Failed to send DM to %s: %s", uid, e)
-    return success, failed
+    user_ids = await get_users_list()
+    return await send_many(bot, user_ids, message, "Failed to send DM to %s: %s")
 
 # -------------------------
 # COMMANDS (same as before)
@@ -183,11 +379,11 @@ async def broadcast_to_users(bot, message: str):
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     u = update.effective_user
     name = f"{u.first_name or ''} {u.last_name or ''}".strip()
-    add_user(u.id, u.username, name)
+    await add_user(u.id, u.username, name)
 
     # if in a group, save group id optionally
     if update.effective_chat and update.effective_chat.type in ("group", "supergroup"):
-        save_group(update.effective_chat.id)
+        await save_group(update.effective_chat.id)
 
     msg = (
         "🙌 Welcome!\n\n"
@@ -229,15 +425,18 @@ async def prayer(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("Use: /prayer <text>")
         return
     u = update.effective_user
-    add_user(u.id, u.username, u.first_name)
-    users = load_json(USERS_FILE, {})
-    uid = str(u.id)
     text = " ".join(context.args)
-    users[uid]["prayer_requests"].append({
-        "text": text,
-        "time": datetime.utcnow().isoformat()
-    })
-    save_json(USERS_FILE, users)
+    now = int(time.time())
+    # register the user (unless text_listener just did) and store the request in one commit
+    user = (u.username, u.first_name)
+    async with db_write():
+        if _KNOWN_USERS.get(u.id) != user:
+            await DB_CONN.execute(UPSERT_USER_SQL, (u.id, *user, now))
+        await DB_CONN.execute(
+            "INSERT INTO prayer_requests(uid, text, time) VALUES (?, ?, ?)",
+            (u.id, text, now)
+        )
+    remember_user(u.id, user)
     await update.message.reply_text("🙏 Prayer saved.")
 
 async def events(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -245,10 +444,9 @@ async def events(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not data:
         await update.message.reply_text("No events.")
         return
-    msg = "🗓 EVENTS\n\n"
-    for e in data:
-        msg += f"{e.get('name')} - {e.get('time')}\n"
-    await update.message.reply_text(msg)
+    lines = ["🗓 EVENTS\n"]
+    lines.extend(f"{e.get('name')} - {e.get('time')}" for e in data)
+    await update.message.reply_text("\n".join(lines))
 
 async def quiz(update: Update, context: ContextTypes.DEFAULT_TYPE):
     data = load_json(QUIZZES_FILE, [])
@@ -257,10 +455,7 @@ async def quiz(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
     q = random.choice(data)
     context.user_data["answer"] = q["answer"]
-    msg = f"❓ {q['question']}\n\n"
-    for c in q["choices"]:
-        msg += c + "\n"
-    msg += "\nReply: /answer A/B/C/D"
+    msg = "\n".join([f"❓ {q['question']}\n", *q["choices"], "\nReply: /answer A/B/C/D"])
     await update.message.reply_text(msg)
 
 async def answer(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -273,43 +468,57 @@ async def answer(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_ans = context.args[0].upper()
     correct = context.user_data["answer"].upper()
     u = update.effective_user
-    users = load_json(USERS_FILE, {})
-    uid = str(u.id)
     if user_ans == correct:
-        users[uid]["quiz_score"] += 1
-        save_json(USERS_FILE, users)
+        async with db_write():
+            async with DB_CONN.execute(
+                "INSERT INTO users(uid, username, full_name, quiz_score, first_seen) VALUES (?, ?, ?, 1, ?) "
+                "ON CONFLICT(uid) DO UPDATE SET quiz_score = quiz_score + 1 RETURNING quiz_score",
+                (u.id, u.username, u.first_name, int(time.time()))
+            ) as cur:
+                score = (await cur.fetchone())[0]
+        _TOPS_CACHE["gen"] += 1
+        _TOPS_CACHE["text"] = None
         await update.message.reply_text(
-            f"✅ Correct! Score: {users[uid]['quiz_score']}"
+            f"✅ Correct! Score: {score}"
         )
     else:
         await update.message.reply_text(
             f"❌ Wrong. Correct: {correct}"
         )
 
+TOPS_CACHE_TTL = getattr(config, "TOPS_CACHE_TTL", 30)
+# formatted leaderboard + when it was built; answer() bumps "gen" when a score changes
+_TOPS_CACHE = {"t": 0.0, "text": None, "gen": 0}
+
 async def tops(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    users = load_json(USERS_FILE, {})
-    if not users:
-        await update.message.reply_text("No data.")
-        return
-    rank = []
-    for u, d in users.items():
-        name = d.get("username") or d.get("full_name") or "Unknown"
-        rank.append((name, d.get("quiz_score", 0)))
-    rank.sort(key=lambda x: x[1], reverse=True)
-    msg = "🏆 TOP PLAYERS\n\n"
-    for i, (n, s) in enumerate(rank[:10], 1):
-        msg += f"{i}. {n} — {s}\n"
-    await update.message.reply_text(msg)
+    now = time.monotonic()
+    text = _TOPS_CACHE["text"]
+    if text is None or now - _TOPS_CACHE["t"] >= TOPS_CACHE_TTL:
+        gen = _TOPS_CACHE["gen"]
+        async with DB_CONN.execute(
+            "SELECT COALESCE(NULLIF(username, ''), NULLIF(full_name, ''), 'Unknown'), quiz_score "
+            "FROM users ORDER BY quiz_score DESC LIMIT 10"
+        ) as cur:
+            rank = await cur.fetchall()
+        if rank:
+            text = "🏆 TOP PLAYERS\n\n" + "\n".join(f"{i}. {n} — {s}" for i, (n, s) in enumerate(rank, 1))
+        else:
+            text = "No data."
+        # don't cache a result a score change may have overtaken while we queried
+        if _TOPS_CACHE["gen"] == gen:
+            _TOPS_CACHE.update(t=now, text=text)
+    await update.message.reply_text(text)
+
+DAILY_MESSAGES = (
+    "Trust in the Lord. 🙏",
+    "God is with you. ✨",
+    "Keep praying. 💙",
+    "Faith over fear. 🌟",
+    "Jesus loves you. ❤️",
+)
 
 async def daily(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    data = [
-        "Trust in the Lord. 🙏",
-        "God is with you. ✨",
-        "Keep praying. 💙",
-        "Faith over fear. 🌟",
-        "Jesus loves you. ❤️",
-    ]
-    await update.message.reply_text(random.choice(data))
+    await update.message.reply_text(random.choice(DAILY_MESSAGES))
 
 # -------------------------
 # ID & Admin commands
@@ -332,9 +541,8 @@ async def addadmin(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     target = None
     if context.args:
-        try:
-            target = int(context.args[0])
-        except Exception:
+        target = parse_id(context.args[0])
+        if target is None:
             await update.message.reply_text("❌ Invalid ID format.")
             return
     elif update.message.reply_to_message:
@@ -348,7 +556,7 @@ async def addadmin(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     ADMINS.add(int(target))
-    persist_admins()
+    await persist_admin(int(target), True)
     await update.message.reply_text(f"✅ Added admin: {target}")
 
 async def listadmins(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -365,14 +573,12 @@ async def deladmin(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not context.args:
         await update.message.reply_text("Usage: /deladmin <user_id>")
         return
-    try:
-        target = int(context.args[0])
-    except Exception:
+    target = parse_id(context.args[0])
+    if target is None:
         await update.message.reply_text("❌ Invalid ID.")
         return
 
-    base = set(getattr(config, "ADMIN_IDS", []))
-    if target in base:
+    if target in _BASE_ADMINS:
         await update.message.reply_text("❌ Cannot remove owner defined in config.py.")
         return
 
@@ -381,7 +587,7 @@ async def deladmin(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     ADMINS.remove(target)
-    persist_admins()
+    await persist_admin(target, False)
     await update.message.reply_text(f"✅ Removed admin: {target}")
 
 # -------------------------
@@ -418,6 +624,65 @@ async def error_handler(update, context):
 # -------------------------
 # Plain-text listener (handles messages without slash commands)
 # -------------------------
+async def _prayer_trigger(update: Update, context: ContextTypes.DEFAULT_TYPE, text: str):
+    # emulate /prayer <text>
+    context.args = text.split()[1:]
+    await prayer(update, context)
+
+async def _answer_trigger(update: Update, context: ContextTypes.DEFAULT_TYPE, text: str):
+    # "answer A"
+    context.args = [text.split()[1]]
+    await answer(update, context)
+
+async def _letter_trigger(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    # just "a" / "b" / "c" / "d"
+    context.args = [update.message.text.strip().upper()]
+    await answer(update, context)
+
+async def _broadcast_trigger(update: Update, context: ContextTypes.DEFAULT_TYPE, text: str):
+    # Admin quick broadcast using "broadcast: message" (must be admin)
+    if not is_admin(update.effective_user.id):
+        await update.message.reply_text("❌ Not authorized for quick broadcast.")
+        return
+    # extract content after colon or space
+    parts = text.split(":", 1)
+    if len(parts) == 2:
+        msg = parts[1].strip()
+    else:
+        msg = text.split(None, 1)[1] if len(text.split(None,1))>1 else ""
+    if not msg:
+        await update.message.reply_text("Usage: broadcast: Your message here")
+        return
+    ok, fail = await broadcast_to_groups(context.bot, msg)
+    await update.message.reply_text(f"✅ Broadcast to groups: Sent {ok}, Failed {fail}")
+
+# whole-message triggers (lowercased)
+TEXT_TRIGGERS = {
+    "verse": verse,
+    "v": verse,
+    "events": events,
+    "quiz": quiz,
+    "a": _letter_trigger,
+    "b": _letter_trigger,
+    "c": _letter_trigger,
+    "d": _letter_trigger,
+    "tops": tops,
+    "ranking": tops,
+    "daily": daily,
+    "daily inspiration": daily,
+    "inspire": daily,
+}
+
+# prefix triggers ("prayer ...", "pray ...", "answer ...", "broadcast: ..."),
+# matched with one regex only when there is no whole-message match
+PREFIX_TRIGGER_RE = re.compile(r"(?:(prayer|pray|answer) |(broadcast)[ :])")
+PREFIX_TRIGGERS = {
+    "prayer": _prayer_trigger,
+    "pray": _prayer_trigger,
+    "answer": _answer_trigger,
+    "broadcast": _broadcast_trigger,
+}
+
 async def text_listener(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not update.message or not update.message.text:
         return
@@ -426,72 +691,18 @@ async def text_listener(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     # save user and optionally group
     u = update.effective_user
-    add_user(u.id, u.username, u.first_name)
+    await add_user(u.id, u.username, u.first_name)
     if update.effective_chat and update.effective_chat.type in ("group", "supergroup"):
-        save_group(update.effective_chat.id)
-
-    # prayer: "prayer ..." or "pray ..."
-    if lower.startswith("prayer ") or lower.startswith("pray "):
-        # emulate /prayer <text>
-        # set context.args and call the handler
-        context.args = text.split()[1:]
-        await prayer(update, context)
-        return
+        await save_group(update.effective_chat.id)
 
-    # verse: user types "verse"
-    if lower == "verse" or lower == "v":
-        await verse(update, context)
+    handler = TEXT_TRIGGERS.get(lower)
+    if handler:
+        await handler(update, context)
         return
 
-    # events
-    if lower == "events":
-        await events(update, context)
-        return
-
-    # quiz
-    if lower == "quiz":
-        await quiz(update, context)
-        return
-
-    # answer (e.g. "answer A" or just "a")
-    tokens = lower.split()
-    if tokens and tokens[0] in ("a", "b", "c", "d", "answer"):
-        if tokens[0] == "answer" and len(tokens) >= 2:
-            context.args = [tokens[1]]
-            await answer(update, context)
-            return
-        elif tokens[0] in ("a","b","c","d"):
-            context.args = [tokens[0].upper()]
-            await answer(update, context)
-            return
-
-    # tops / ranking
-    if lower in ("tops", "ranking"):
-        await tops(update, context)
-        return
-
-    # daily inspiration: "daily" or "inspire"
-    if lower in ("daily", "daily inspiration", "inspire"):
-        await daily(update, context)
-        return
-
-    # Admin quick broadcast using "broadcast: message" (must be admin)
-    if lower.startswith("broadcast:") or lower.startswith("broadcast «") or lower.startswith("broadcast "):
-        # only allow when admin
-        if not is_admin(u.id):
-            await update.message.reply_text("❌ Not authorized for quick broadcast.")
-            return
-        # extract content after colon or space
-        parts = text.split(":", 1)
-        if len(parts) == 2:
-            msg = parts[1].strip()
-        else:
-            msg = text.split(None, 1)[1] if len(text.split(None,1))>1 else ""
-        if not msg:
-            await update.message.reply_text("Usage: broadcast: Your message here")
-            return
-        ok, fail = await broadcast_to_groups(context.bot, msg)
-        await update.message.reply_text(f"✅ Broadcast to groups: Sent {ok}, Failed {fail}")
+    m = PREFIX_TRIGGER_RE.match(lower)
+    if m:
+        await PREFIX_TRIGGERS[m.group(1) or m.group(2)](update, context, text)
         return
 
     # otherwise: ignore / or you can add more triggers here
@@ -501,14 +712,7 @@ async def text_listener(update: Update, context: ContextTypes.DEFAULT_TYPE):
 # -------------------------
 async def scheduled_daily_inspiration(context: ContextTypes.DEFAULT_TYPE):
     """job callback for daily inspiration"""
-    data = [
-        "Trust in the Lord. 🙏",
-        "God is with you. ✨",
-        "Keep praying. 💙",
-        "Faith over fear. 🌟",
-        "Jesus loves you. ❤️",
-    ]
-    message = random.choice(data)
+    message = random.choice(DAILY_MESSAGES)
     await broadcast_to_groups(context.bot, "📬 Daily Inspiration:\n\n" + message)
 
 async def scheduled_random_verse(context: ContextTypes.DEFAULT_TYPE):
@@ -519,13 +723,6 @@ async def scheduled_random_verse(context: ContextTypes.DEFAULT_TYPE):
     message = "📖 " + random.choice(data)
     await broadcast_to_groups(context.bot, message)
 
-def seconds_until(hour: int, minute: int) -> float:
-    now = datetime.now()
-    target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
-    if target <= now:
-        target = target + timedelta(days=1)
-    return (target - now).total_seconds()
-
 # -------------------------
 # Main
 # -------------------------
@@ -533,7 +730,17 @@ def main():
     if not getattr(config, "BOT_TOKEN", None):
         raise SystemExit("BOT_TOKEN missing in config.py")
 
-    app = ApplicationBuilder().token(config.BOT_TOKEN).build()
+    app = (
+        ApplicationBuilder()
+        .token(config.BOT_TOKEN)
+        .concurrent_updates(True)
+        # long polling holds getUpdates open; give it room so it doesn't time out and reconnect
+        .get_updates_read_timeout(30)
+        .pool_timeout(10)
+        .post_init(init_db)
+        .post_shutdown(close_db)
+        .build()
+    )
 
     # basic commands
     app.add_handler(CommandHandler("start", start))
@@ -565,21 +772,20 @@ def main():
     if getattr(config, "AUTO_ENABLE_TEXT_TRIGGERS", True):
         app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, text_listener))
 
-    # Scheduled jobs (if enabled in config)
+    # Scheduled jobs (if enabled in config), in config.TIMEZONE (e.g. "Asia/Yangon")
+    # or the server's zone; a real zone, so DST changes don't shift the post time
+    tz = ZoneInfo(config.TIMEZONE) if getattr(config, "TIMEZONE", None) else get_localzone()
     # DAILY
     if getattr(config, "AUTO_DAILY", False):
         dh = getattr(config, "DAILY_HOUR", 9)
         dm = getattr(config, "DAILY_MINUTE", 0)
-        first_seconds = seconds_until(dh, dm)
-        # schedule every 24h
-        app.job_queue.run_repeating(scheduled_daily_inspiration, interval=24*3600, first=first_seconds)
+        app.job_queue.run_daily(scheduled_daily_inspiration, dtime(hour=dh, minute=dm, tzinfo=tz))
 
     # RANDOM VERSE
     if getattr(config, "AUTO_VERSE", False):
         vh = getattr(config, "VERSE_HOUR", 12)
         vm = getattr(config, "VERSE_MINUTE", 0)
-        first_seconds = seconds_until(vh, vm)
-        app.job_queue.run_repeating(scheduled_random_verse, interval=24*3600, first=first_seconds)
+        app.job_queue.run_daily(scheduled_random_verse, dtime(hour=vh, minute=vm, tzinfo=tz))
 
     logger.info("✅ BOT STARTED (with text triggers=%s)", getattr(config, "AUTO_ENABLE_TEXT_TRIGGERS", True))
     app.run_polling(drop_pending_updates=True, allowed_updates=Update.ALL_TYPES)